@@ -0,0 +1,76 @@
+# dht11_pigpio.py
+"""
+DHT11 driver on top of the pigpio daemon.
+
+Adafruit_DHT.read_retry busy-waits ~20 ms of elevated-priority C code
+per attempt to bit-bang the wire, pinning a core for the duration. Here
+pigpiod timestamps the sensor's edges in µs ticks (DMA-paced), so a
+read is one 18 ms trigger pulse plus asynchronous edge decoding — the
+calling thread just waits on an Event, no busy loop in this process.
+"""
+import threading
+import time
+from typing import Optional, Tuple
+
+import pigpio
+
+TRIGGER_LOW_SEC = 0.018    # host holds the line low >=18 ms to start a read
+READ_TIMEOUT_SEC = 0.5     # the 40-bit frame itself takes ~4 ms
+BIT_ONE_THRESHOLD_US = 50  # high pulse: ~26-28 µs for a 0, ~70 µs for a 1
+
+class DHT11:
+    def __init__(self, pi: pigpio.pi, gpio: int):
+        self.pi = pi
+        self.gpio = gpio
+        self._done = threading.Event()
+        self._high_tick = None
+        self._pulses = []
+        self._cb = pi.callback(gpio, pigpio.EITHER_EDGE, self._on_edge)
+
+    def _on_edge(self, gpio, level, tick):
+        if level == 1:
+            self._high_tick = tick
+        elif self._high_tick is not None:
+            self._pulses.append(pigpio.tickDiff(self._high_tick, tick))
+            # 1 host-release gap (the rising edge at set_mode(INPUT) also
+            # starts a pulse) + 1 sensor-response pulse + 40 data bits
+            if len(self._pulses) >= 42:
+                self._done.set()
+
+    def read(self) -> Tuple[Optional[float], Optional[float]]:
+        """One read attempt; returns (humidity %, temperature °C) or (None, None)."""
+        self._pulses = []
+        self._high_tick = None
+        self._done.clear()
+
+        self.pi.set_mode(self.gpio, pigpio.OUTPUT)
+        self.pi.write(self.gpio, 0)
+        time.sleep(TRIGGER_LOW_SEC)
+        self.pi.set_mode(self.gpio, pigpio.INPUT)
+        self.pi.set_pull_up_down(self.gpio, pigpio.PUD_UP)
+
+        if not self._done.wait(READ_TIMEOUT_SEC):
+            return None, None
+
+        data = 0
+        for width in self._pulses[-40:]:
+            data = (data << 1) | (1 if width > BIT_ONE_THRESHOLD_US else 0)
+        b = data.to_bytes(5, "big")
+        if (b[0] + b[1] + b[2] + b[3]) & 0xFF != b[4]:
+            return None, None  # checksum mismatch
+        # DHT11 reports integer humidity/temperature in bytes 0 and 2
+        return float(b[0]), float(b[2])
+
+    def read_retry(self, retries: int = 3,
+                   delay_sec: float = 2.0) -> Tuple[Optional[float], Optional[float]]:
+        """Like Adafruit_DHT.read_retry: retry failed reads with a settle delay."""
+        for attempt in range(retries):
+            humidity, temperature = self.read()
+            if temperature is not None:
+                return humidity, temperature
+            if attempt < retries - 1:
+                time.sleep(delay_sec)
+        return None, None
+
+    def close(self):
+        self._cb.cancel()
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
 import os
 import time
 import threading
+from dataclasses import dataclass, replace, asdict
+from typing import Optional
 
 try:
     from dotenv import load_dotenv
@@ -11,9 +14,12 @@ except Exception:
     pass
 
 import requests  # ensure installed
-from iot_integrations import ThingSpeakClient, Telegram, TelegramBotThread, AlertGate
+from iot_integrations import ThingSpeakClient, Telegram, AlertGate
+from tg_async import TelegramBot
+from dht11_pigpio import DHT11
+from system_state import SystemState
 
-import Adafruit_DHT
+import pigpio
 import RPi.GPIO as GPIO
 from RPLCD.i2c import CharLCD
 
@@ -21,6 +27,9 @@ from RPLCD.i2c import CharLCD
 GPIO.setmode(GPIO.BOARD)
 GPIO.setwarnings(False)
 
+# pigpio daemon handle (BCM numbering) for timing-critical pins
+pi = pigpio.pi()
+
 # I2C LCD (16x2)
 LCD_I2C_ADDR = 0x3f   # from i2cdetect -y 1
 LCD_COLS = 16
@@ -37,13 +46,12 @@ PIR_ACTIVE_LEVEL = GPIO.LOW
 DC_MOTOR_PIN = 16       # BOARD 16
 
 # DHT11
-DHT_SENSOR = Adafruit_DHT.DHT11
 DHT_PIN_BOARD = 40      # BOARD pin (physical) - for your reference
-DHT_PIN_BCM   = 21      # BCM pin actually used by Adafruit_DHT
+DHT_PIN_BCM   = 21      # BCM pin used by the pigpio driver
 
-# Ultrasonic (HC-SR04 style)
-ULTRA_TRIG = 22         # BOARD 22 (OUTPUT)
-ULTRA_ECHO = 13         # BOARD 13 (INPUT - level shift to 3.3 V!)
+# Ultrasonic (HC-SR04 style) - driven via pigpio, so BCM numbering
+ULTRA_TRIG_BCM = 25     # BOARD 22 (OUTPUT)
+ULTRA_ECHO_BCM = 27     # BOARD 13 (INPUT - level shift to 3.3 V!)
 
 # Moisture sensor (digital)
 MOISTURE_PIN = 7        # BOARD 7
@@ -57,21 +65,25 @@ KEYPAD_LAYOUT = [
     ["*", "0", "#"]
 ]
 
-# These BOARD pins are the conversion of your working BCM pins:
+# Keypad is scanned via pigpio, so BCM numbering:
 #   ROWS (BCM -> BOARD): [6->31, 20->38, 19->35, 13->33]
 #   COLS (BCM -> BOARD): [12->32, 5->29, 16->36]
-KEYPAD_ROWS = [31, 38, 35, 33]   # inputs with pull-ups
-KEYPAD_COLS = [32, 29, 36]       # outputs, driven LOW one by one
+KEYPAD_ROWS_BCM = [6, 20, 19, 13]   # inputs with pull-ups
+KEYPAD_COLS_BCM = [12, 5, 16]       # outputs, driven LOW one by one
+KEYPAD_ROW_MASK = sum(1 << b for b in KEYPAD_ROWS_BCM)
 
 # Water / beaker
 BEAKER_HEIGHT_CM = 10.0
 WATER_LOW_DISTANCE_CM = 7.0  # >7cm == low
 
-# Timings
+# Timings (per-sensor periods for the asyncio scheduler)
 MAIN_LOOP_SLEEP = 0.25
-SENSOR_POLL_INTERVAL = 1.0
+ULTRA_POLL_INTERVAL = 1.0
+MOISTURE_POLL_INTERVAL = 1.0
+DHT_POLL_INTERVAL = 5.0       # safe for DHT11
+TS_CHECK_INTERVAL = 1.0
 KEYPAD_SCAN_INTERVAL = 0.02   # 20ms
-KEY_DEBOUNCE_RELEASE_SEC = 0.1
+KEY_DEBOUNCE_NS = 30_000_000  # 30ms between accepted edges per key
 
 # Sanity limits for DHT11
 TEMP_MIN_C = -20
@@ -79,20 +91,33 @@ TEMP_MAX_C = 80
 
 # --------------- GLOBALS ----------------
 stop_event = threading.Event()
-last_distance_cm = None
-keypad_last_state = [[False]*len(KEYPAD_COLS) for _ in range(len(KEYPAD_ROWS))]
-
-# Shared readings for ThingSpeak/Telegram
-readings_lock = threading.Lock()
-readings = {
-    "temp_c": None,
-    "humidity": None,       # optional
-    "distance_cm": None,
-    "water_height": None,
-    "soil_dry": None,
-    "pir_active": None,
-    "motor_on": 0,
-}
+keypad_last_state = [[False]*len(KEYPAD_COLS_BCM) for _ in range(len(KEYPAD_ROWS_BCM))]
+
+# Shared readings for ThingSpeak/Telegram: an immutable snapshot.
+# Writers build a new Readings via dataclasses.replace and publish it
+# with a plain assignment (atomic in CPython); readers just bind the
+# current snapshot, lock-free. Writers do serialize on a small mutex:
+# replace() is a read-modify-write, and fields are written from several
+# threads (keypad, asyncio sensor loop, GPIO callbacks), so an unguarded
+# writer preempted mid-replace would republish stale values of every
+# other field.
+@dataclass(frozen=True, slots=True)
+class Readings:
+    temp_c: Optional[float] = None
+    humidity: Optional[float] = None       # optional
+    distance_cm: Optional[float] = None
+    water_height: Optional[float] = None
+    soil_dry: Optional[int] = None
+    pir_active: Optional[int] = None
+    motor_on: int = 0
+
+_readings = Readings()
+_readings_write_lock = threading.Lock()
+
+def publish_readings(**updates):
+    global _readings
+    with _readings_write_lock:
+        _readings = replace(_readings, **updates)
 
 # LCD
 lcd = CharLCD('PCF8574', LCD_I2C_ADDR, cols=LCD_COLS, rows=LCD_ROWS,
@@ -103,6 +128,14 @@ lcd_lock = threading.Lock()
 TS_KEY = os.getenv("THINGSPEAK_WRITE_KEY")
 TG_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TG_CHAT  = os.getenv("TELEGRAM_CHAT_ID")
+# Public HTTPS URL (e.g. ngrok) for the Telegram webhook; falls back to
+# long-polling when unset.
+TG_WEBHOOK_URL  = os.getenv("TELEGRAM_WEBHOOK_URL")
+TG_WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8080"))
+
+# Software toggle (system_state.txt), cached in memory and refreshed by
+# inotify — no file I/O in the sensor loops.
+system_state = SystemState()
 
 ts_client = ThingSpeakClient(write_key=TS_KEY) if TS_KEY else None
 tg_client = Telegram(TG_TOKEN, TG_CHAT) if (TG_TOKEN and TG_CHAT) else None
@@ -120,58 +153,115 @@ def lcd_print(line1: str, line2: str = ""):
             lcd.write_string(line2[:LCD_COLS])
 
 # --------------- HELPERS ----------------
+# PIR and slide switch are kept fresh by kernel edge interrupts
+# (GPIO.add_event_detect in main()); readers see cached values and no
+# thread burns cycles polling pins that rarely change.
+_slide_on = False
+
+def _slide_changed(channel):
+    global _slide_on
+    _slide_on = GPIO.input(channel) == GPIO.HIGH
+
+def _pir_changed(channel):
+    # 0 == presence (active LOW)
+    val = GPIO.input(channel) == PIR_ACTIVE_LEVEL
+    publish_readings(pir_active=1 if val else 0)
+
 def slide_switch_on():
-    return GPIO.input(SLIDE_SWITCH_PIN) == GPIO.HIGH
+    return _slide_on
+
+def system_enabled():
+    # Slide switch is the hardware master; system_state.txt is the
+    # software toggle other tools can flip without touching the Pi.
+    return slide_switch_on() and system_state.enabled
 
 def pir_active():
-    # 0 == presence (active LOW)
-    val = (GPIO.input(PIR_PIN) == PIR_ACTIVE_LEVEL)
-    with readings_lock:
-        readings["pir_active"] = 1 if val else 0
-    return val
+    return _readings.pir_active == 1
+
+# Last commanded motor level: the moisture task re-commands the motor
+# every poll, but the pin write, snapshot publish and log line should
+# only happen on actual transitions (no relay chatter, no ioctl spam).
+_motor_state = 0
+_soil_dry_last = None
+
+def _set_motor(desired):
+    global _motor_state
+    if desired == _motor_state:
+        return
+    GPIO.output(DC_MOTOR_PIN, GPIO.HIGH if desired else GPIO.LOW)
+    _motor_state = desired
+    publish_readings(motor_on=desired)
+    print(f"[MOTOR] {'ON (soil dry)' if desired else 'OFF (soil moist)'}")
 
 def motor_on():
-    GPIO.output(DC_MOTOR_PIN, GPIO.HIGH)
-    with readings_lock:
-        readings["motor_on"] = 1
+    _set_motor(1)
 
 def motor_off():
-    GPIO.output(DC_MOTOR_PIN, GPIO.LOW)
-    with readings_lock:
-        readings["motor_on"] = 0
+    _set_motor(0)
 
 def moisture_is_dry():
+    global _soil_dry_last
     val = GPIO.input(MOISTURE_PIN) == MOISTURE_IS_DRY_LEVEL
-    with readings_lock:
-        readings["soil_dry"] = 1 if val else 0
+    # Publish only on change; a stable soil reading costs one pin read
+    if val != _soil_dry_last:
+        _soil_dry_last = val
+        publish_readings(soil_dry=1 if val else 0)
     return val
 
-def read_ultrasonic_distance_cm():
-    GPIO.output(ULTRA_TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(ULTRA_TRIG, False)
+class UltrasonicReader:
+    """
+    HC-SR04 reader timed by the pigpio daemon: echo edges are
+    timestamped in microsecond ticks inside pigpiod, so no Python-level
+    sampling loop and none of its jitter.
+    """
+    def __init__(self, pi, trig_bcm, echo_bcm):
+        self.pi = pi
+        self.trig = trig_bcm
+        self.echo = echo_bcm
+        self._t0 = None
+        self._dt = None
+        self._done = threading.Event()
+        pi.set_mode(trig_bcm, pigpio.OUTPUT)
+        pi.write(trig_bcm, 0)
+        pi.set_mode(echo_bcm, pigpio.INPUT)
+        self._cb = pi.callback(echo_bcm, pigpio.EITHER_EDGE, self._on_edge)
+        # DMA-paced 10 µs trigger pulse, built once and replayed per read
+        pi.wave_add_generic([pigpio.pulse(1 << trig_bcm, 0, 10),
+                             pigpio.pulse(0, 1 << trig_bcm, 0)])
+        self._trig_wave = pi.wave_create()
+
+    def _on_edge(self, gpio, level, tick):
+        if level == 1:
+            self._t0 = tick
+        elif self._t0 is not None:
+            self._dt = pigpio.tickDiff(self._t0, tick)
+            self._done.set()
+
+    def read_cm(self, timeout=0.03):
+        self._done.clear()
+        self._t0 = None
+        self._dt = None
+        self.pi.wave_send_once(self._trig_wave)
+        if not self._done.wait(timeout) or self._dt is None:
+            return -1.0
+        return self._dt * 34300 / 2.0 / 1e6
+
+    def close(self):
+        self._cb.cancel()
+        self.pi.wave_delete(self._trig_wave)
+
+ultrasonic = UltrasonicReader(pi, ULTRA_TRIG_BCM, ULTRA_ECHO_BCM)
+dht = DHT11(pi, DHT_PIN_BCM)
 
-    start = time.time()
-    timeout = start + 0.02
-    while GPIO.input(ULTRA_ECHO) == 0 and time.time() < timeout:
-        start = time.time()
-
-    stop = time.time()
-    timeout = stop + 0.02
-    while GPIO.input(ULTRA_ECHO) == 1 and time.time() < timeout:
-        stop = time.time()
-
-    elapsed = stop - start
-    distance = (elapsed * 34300) / 2.0
-    return distance
+def read_ultrasonic_distance_cm():
+    return ultrasonic.read_cm()
 
 def calc_water_height(distance_cm):
     h = BEAKER_HEIGHT_CM - distance_cm
     return max(0.0, min(BEAKER_HEIGHT_CM, h))
 
 def read_dht11_both():
-    # IMPORTANT: Adafruit_DHT expects BCM numbering
-    humidity, temperature = Adafruit_DHT.read_retry(DHT_SENSOR, DHT_PIN_BCM)
+    humidity, temperature = dht.read_retry()
     if temperature is None or not (TEMP_MIN_C <= temperature <= TEMP_MAX_C):
         return None, None
     return humidity, float(temperature)
@@ -179,10 +269,8 @@ def read_dht11_both():
 def check_and_drive_motor():
     if moisture_is_dry():
         motor_on()
-        print("[MOTOR] ON (soil dry)")
     else:
         motor_off()
-        print("[MOTOR] OFF (soil moist)")
 
 def everything_off():
     motor_off()
@@ -197,9 +285,7 @@ def handle_keypress(key):
                 lcd_print("Water: invalid")
                 return
             height = calc_water_height(d)
-            with readings_lock:
-                readings["distance_cm"] = float(d)
-                readings["water_height"] = float(height)
+            publish_readings(distance_cm=float(d), water_height=float(height))
             print(f"[KEYPAD-1] Water height = {height:.2f} cm (distance = {d:.2f} cm)")
             lcd_print(f"Water:{height:6.2f}cm", f"Dist: {d:6.2f}cm")
         except Exception as e:
@@ -215,10 +301,10 @@ def handle_keypress(key):
                 print("[KEYPAD-2] Failed / invalid DHT11 reading.")
                 lcd_print("Temp read fail")
                 return
-            with readings_lock:
-                readings["temp_c"] = t
-                if h is not None:
-                    readings["humidity"] = float(h)
+            if h is not None:
+                publish_readings(temp_c=t, humidity=float(h))
+            else:
+                publish_readings(temp_c=t)
             print(f"[KEYPAD-2] Temperature = {t:.2f} °C")
             lcd_print(f"Temp: {t:.2f} C")
         except Exception as e:
@@ -230,29 +316,42 @@ def handle_keypress(key):
     print(f"[KEYPAD] Key pressed: {key}")
 
 # --------------- TELEGRAM HELPERS -----------------
+# Cached /status text. publish_readings installs a brand-new Readings
+# object on every write, so 'snap is _status_snap' doubles as the
+# invalidation check — no version counter needed.
+_status_cache: Optional[str] = None
+_status_snap: Optional[Readings] = None
+
 def get_status_text():
-    with readings_lock:
-        r = dict(readings)
+    global _status_cache, _status_snap
+    snap = _readings  # atomic bind of the current snapshot
+    if snap is _status_snap and _status_cache is not None:
+        return _status_cache
+    r = snap
     lines = [
         "🌡️ Status:",
-        f"Temp: {r['temp_c']} °C" if r['temp_c'] is not None else "Temp: n/a",
-        f"Humidity: {r['humidity']} %" if r.get('humidity') is not None else "Humidity: n/a",
-        f"Water height: {r['water_height']} cm" if r.get('water_height') is not None else "Water height: n/a",
-        f"Distance: {r['distance_cm']} cm" if r['distance_cm'] is not None else "Distance: n/a",
-        f"Soil: {'DRY' if r['soil_dry'] else 'MOIST' if r['soil_dry'] is not None else 'n/a'}",
-        f"PIR: {'ACTIVE' if r['pir_active'] else 'IDLE' if r['pir_active'] is not None else 'n/a'}",
-        f"Motor: {'ON' if r['motor_on'] else 'OFF'}",
+        f"Temp: {r.temp_c} °C" if r.temp_c is not None else "Temp: n/a",
+        f"Humidity: {r.humidity} %" if r.humidity is not None else "Humidity: n/a",
+        f"Water height: {r.water_height} cm" if r.water_height is not None else "Water height: n/a",
+        f"Distance: {r.distance_cm} cm" if r.distance_cm is not None else "Distance: n/a",
+        f"Soil: {'DRY' if r.soil_dry else 'MOIST' if r.soil_dry is not None else 'n/a'}",
+        f"PIR: {'ACTIVE' if r.pir_active else 'IDLE' if r.pir_active is not None else 'n/a'}",
+        f"Motor: {'ON' if r.motor_on else 'OFF'}",
     ]
-    return "\n".join(lines)
+    _status_cache = "\n".join(lines)
+    _status_snap = snap
+    return _status_cache
 
 def start_telegram_bot():
     global tg_bot
     if tg_client:
         tg_client.send("🔔 System booted.")
-        tg_bot = TelegramBotThread(
+        tg_bot = TelegramBot(
             token=TG_TOKEN,
             chat_id=TG_CHAT,
-            get_status_cb=get_status_text
+            get_status_cb=get_status_text,
+            webhook_url=TG_WEBHOOK_URL,
+            webhook_port=TG_WEBHOOK_PORT
         )
         tg_bot.start()
 
@@ -260,50 +359,53 @@ def start_telegram_bot():
 def keypad_scanner_thread():
     """Always scan; only process keys when PIR is active (0)."""
     global keypad_last_state
-    rows = KEYPAD_ROWS
-    cols = KEYPAD_COLS
+    rows = KEYPAD_ROWS_BCM
+    cols = KEYPAD_COLS_BCM
+    # Debounce by timestamp: ignore edges within KEY_DEBOUNCE_NS of the
+    # previous accepted edge instead of blocking until key release, so
+    # the scanner keeps its 20 ms cadence regardless of key hold time.
+    last_edge_ns = [[0] * len(cols) for _ in range(len(rows))]
 
     while not stop_event.is_set():
         active = pir_active()
 
-        for c_idx, c_pin in enumerate(cols):
-            GPIO.output(c_pin, GPIO.LOW)
+        for c_idx, c_bcm in enumerate(cols):
+            pi.write(c_bcm, 0)
+            # One bank read returns GPIO 0-31, covering all four rows
+            bank = pi.read_bank_1()
+            pi.write(c_bcm, 1)
+            pressed_bits = ~bank & KEYPAD_ROW_MASK  # rows are active LOW
 
-            for r_idx, r_pin in enumerate(rows):
-                pressed_now = GPIO.input(r_pin) == GPIO.LOW  # active LOW
+            for r_idx, r_bcm in enumerate(rows):
+                pressed_now = bool(pressed_bits & (1 << r_bcm))
                 pressed_before = keypad_last_state[r_idx][c_idx]
 
                 if pressed_now and not pressed_before:
-                    key = KEYPAD_LAYOUT[r_idx][c_idx]
-                    if active:
-                        handle_keypress(key)
-                    while GPIO.input(r_pin) == GPIO.LOW and not stop_event.is_set():
-                        time.sleep(KEY_DEBOUNCE_RELEASE_SEC)
+                    now = time.monotonic_ns()
+                    if now - last_edge_ns[r_idx][c_idx] > KEY_DEBOUNCE_NS:
+                        last_edge_ns[r_idx][c_idx] = now
+                        if active:
+                            handle_keypress(KEYPAD_LAYOUT[r_idx][c_idx])
 
                 keypad_last_state[r_idx][c_idx] = pressed_now
 
-            GPIO.output(c_pin, GPIO.HIGH)
-
         time.sleep(KEYPAD_SCAN_INTERVAL)
 
-def sensors_thread():
-    global last_distance_cm
-    last_dht_time = 0
-    DHT_PERIOD = 5  # seconds; safe for DHT11
+# Each sensor runs as its own coroutine with its own period, so a slow
+# DHT read (up to hundreds of ms with retries) never delays PIR or
+# ultrasonic sampling. Blocking calls (DHT, HTTP) go through
+# run_in_executor; fast GPIO reads and the queue-backed alert
+# enqueue stay inline.
 
+async def ultrasonic_task():
+    loop = asyncio.get_running_loop()
     while not stop_event.is_set():
-        if not slide_switch_on():
-            motor_off()
-            time.sleep(SENSOR_POLL_INTERVAL)
+        if not system_enabled():
+            await asyncio.sleep(ULTRA_POLL_INTERVAL)
             continue
 
-        # PIR (also updates shared state)
-        active = pir_active()
-
-        # Ultrasonic (periodic)
         try:
-            distance = read_ultrasonic_distance_cm()
-            last_distance_cm = distance
+            distance = await loop.run_in_executor(None, read_ultrasonic_distance_cm)
         except Exception as e:
             print(f"[ULTRASONIC] Read error: {e}")
             distance = -1
@@ -322,50 +424,65 @@ def sensors_thread():
             print("[ULTRASONIC] Bad reading.")
 
         height = calc_water_height(distance if distance > 0 else BEAKER_HEIGHT_CM)
+        publish_readings(distance_cm=float(distance) if distance > 0 else None,
+                         water_height=float(height))
 
-        # Moisture / motor
-        was_dry = moisture_is_dry()
-        check_and_drive_motor()
-        if alerts:
-            alerts.maybe_send("soil_dry", was_dry,
-                "🌱 Soil is DRY — motor turned ON." if was_dry else "🌧️ Soil MOIST — motor turned OFF.")
-
-        # Periodic DHT refresh
-        now = time.time()
-        if now - last_dht_time >= DHT_PERIOD:
-            last_dht_time = now
+        await asyncio.sleep(ULTRA_POLL_INTERVAL)
+
+async def moisture_task():
+    while not stop_event.is_set():
+        if not system_enabled():
+            motor_off()
+        else:
+            was_dry = moisture_is_dry()
+            check_and_drive_motor()
+            if alerts:
+                alerts.maybe_send("soil_dry", was_dry,
+                    "🌱 Soil is DRY — motor turned ON." if was_dry else "🌧️ Soil MOIST — motor turned OFF.")
+        await asyncio.sleep(MOISTURE_POLL_INTERVAL)
+
+async def dht_task():
+    loop = asyncio.get_running_loop()
+    while not stop_event.is_set():
+        if system_enabled():
             try:
-                humidity, temperature = Adafruit_DHT.read_retry(DHT_SENSOR, DHT_PIN_BCM)
+                humidity, temperature = await loop.run_in_executor(None, read_dht11_both)
             except Exception:
                 humidity, temperature = None, None
 
-            if temperature is not None and (TEMP_MIN_C <= temperature <= TEMP_MAX_C):
-                with readings_lock:
-                    readings["temp_c"] = float(temperature)
+            if temperature is not None:
                 if humidity is not None:
-                    with readings_lock:
-                        readings["humidity"] = float(humidity)
-
-        # Update shared ultrasonic/water
-        with readings_lock:
-            readings["distance_cm"] = float(distance) if distance > 0 else None
-            readings["water_height"] = float(height)
-
-        time.sleep(SENSOR_POLL_INTERVAL)
+                    publish_readings(temp_c=temperature, humidity=float(humidity))
+                else:
+                    publish_readings(temp_c=temperature)
+        await asyncio.sleep(DHT_POLL_INTERVAL)
 
-def thingspeak_thread():
+async def thingspeak_task():
     if not ts_client:
         return
+    loop = asyncio.get_running_loop()
     while not stop_event.is_set():
-        # Respect min 15s interval inside client
-        with readings_lock:
-            payload = dict(readings)
-        ok = ts_client.push(**payload)
-        if ok:
-            print("[ThingSpeak] Updated.")
-        else:
-            print("[ThingSpeak] Skipped or failed.")
-        time.sleep(5)  # loop frequently; client enforces 15s guard
+        # Skip the snapshot/encode pipeline entirely while the client's
+        # 15s window is still closed — push() would just drop it anyway.
+        if ts_client.ready():
+            payload = asdict(_readings)
+            try:
+                ok = await loop.run_in_executor(None, lambda: ts_client.push(**payload))
+            except Exception as e:
+                print(f"[ThingSpeak] Push error: {e}")
+                ok = False
+            if ok:
+                print("[ThingSpeak] Updated.")
+            else:
+                print("[ThingSpeak] Failed.")
+        await asyncio.sleep(TS_CHECK_INTERVAL)
+
+async def sensor_scheduler():
+    await asyncio.gather(ultrasonic_task(), moisture_task(),
+                         dht_task(), thingspeak_task())
+
+def sensors_loop_thread():
+    asyncio.run(sensor_scheduler())
 
 # --------------- MAIN -------------------
 def main():
@@ -375,22 +492,30 @@ def main():
     # PIR active-low -> pull-up keeps it at 1 when idle
     GPIO.setup(PIR_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
+    # Prime the cached levels once, then let kernel edge events keep
+    # them fresh — no polling task for either pin.
+    _slide_changed(SLIDE_SWITCH_PIN)
+    _pir_changed(PIR_PIN)
+    GPIO.add_event_detect(SLIDE_SWITCH_PIN, GPIO.BOTH,
+                          callback=_slide_changed, bouncetime=50)
+    GPIO.add_event_detect(PIR_PIN, GPIO.BOTH,
+                          callback=_pir_changed, bouncetime=50)
+
     GPIO.setup(DC_MOTOR_PIN, GPIO.OUT)
     GPIO.output(DC_MOTOR_PIN, GPIO.LOW)
 
-    GPIO.setup(ULTRA_TRIG, GPIO.OUT)
-    GPIO.setup(ULTRA_ECHO, GPIO.IN)
-    GPIO.output(ULTRA_TRIG, GPIO.LOW)
+    # Ultrasonic pins are owned by the pigpio-backed UltrasonicReader
 
     GPIO.setup(MOISTURE_PIN, GPIO.IN)
 
-    # Keypad setup
-    for c in KEYPAD_COLS:
-        GPIO.setup(c, GPIO.OUT)
-        GPIO.output(c, GPIO.HIGH)
+    # Keypad setup (pigpio/BCM): columns idle HIGH, rows pulled up
+    for c in KEYPAD_COLS_BCM:
+        pi.set_mode(c, pigpio.OUTPUT)
+        pi.write(c, 1)
 
-    for r in KEYPAD_ROWS:
-        GPIO.setup(r, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    for r in KEYPAD_ROWS_BCM:
+        pi.set_mode(r, pigpio.INPUT)
+        pi.set_pull_up_down(r, pigpio.PUD_UP)
 
     print("[SYSTEM] Booting. BOARD pin numbering.")
     print("PIR is active-LOW (0 = presence). Keypad only acts when PIR is 0.")
@@ -400,11 +525,9 @@ def main():
     everything_off()
 
     kt = threading.Thread(target=keypad_scanner_thread, daemon=True)
-    st = threading.Thread(target=sensors_thread, daemon=True)
-    ct = threading.Thread(target=thingspeak_thread, daemon=True)
+    st = threading.Thread(target=sensors_loop_thread, daemon=True)
     kt.start()
     st.start()
-    ct.start()
 
     start_telegram_bot()  # start polling bot if configured
 
@@ -421,6 +544,9 @@ def main():
         everything_off()
         with lcd_lock:
             lcd.clear()
+        ultrasonic.close()
+        dht.close()
+        pi.stop()
         GPIO.cleanup()
         print("[SYSTEM] Clean exit.")
 
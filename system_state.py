@@ -0,0 +1,66 @@
+# system_state.py
+"""
+Cached view of the system_state.txt toggle file.
+
+The state file ("enabled"/"disabled") is a cross-process switch; reading
+it from a sensor loop would cost an open()+read() per tick for a value
+that changes seconds-to-minutes apart. SystemState reads the file once,
+then a background thread blocks on inotify and refreshes the cached
+value only when the file actually changes — the hot path is a plain
+attribute read. write() replaces the file atomically via os.replace so
+watchers never see a partial write.
+"""
+import os
+import threading
+
+from inotify_simple import INotify, flags
+
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "system_state.txt")
+DEFAULT_STATE = "enabled"
+
+class SystemState:
+    def __init__(self, path: str = STATE_FILE):
+        self.path = path
+        self._value = self._read()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    @property
+    def value(self) -> str:
+        return self._value
+
+    @property
+    def enabled(self) -> bool:
+        return self._value == "enabled"
+
+    def write(self, value: str):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(value + "\n")
+        os.replace(tmp, self.path)
+        self._value = value
+
+    def close(self):
+        self._stop.set()
+
+    def _read(self) -> str:
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or DEFAULT_STATE
+        except OSError:
+            return DEFAULT_STATE
+
+    def _watch(self):
+        # Watch the directory, not the file: atomic os.replace swaps the
+        # inode, which would silently orphan a file-level watch.
+        ino = INotify()
+        ino.add_watch(os.path.dirname(self.path) or ".",
+                      flags.CLOSE_WRITE | flags.MOVED_TO)
+        name = os.path.basename(self.path)
+        while not self._stop.is_set():
+            for ev in ino.read(timeout=1000):
+                if ev.name == name:
+                    self._value = self._read()
+        ino.close()
@@ -0,0 +1,162 @@
+# tg_async.py
+"""
+Asyncio Telegram bot.
+
+Preferred mode is a webhook: we call setWebhook once at boot and Telegram
+POSTs updates to a small aiohttp endpoint only when they exist — zero
+traffic at idle and lower latency than polling. When no public URL is
+configured (TELEGRAM_WEBHOOK_URL unset, e.g. Pi behind NAT without
+ngrok), we fall back to long-polling getUpdates on the same event loop.
+Either way one aiohttp session (small keep-alive connector) is shared by
+inbound handling and sendMessage so TLS to api.telegram.org is reused.
+"""
+import asyncio
+import threading
+from typing import Optional
+from urllib.parse import quote_plus
+
+import aiohttp
+from aiohttp import web
+
+try:
+    from orjson import loads as json_loads  # ~3-6x faster on the Pi
+except ImportError:
+    from json import loads as json_loads
+
+POLL_TIMEOUT = 20       # server-side long-poll timeout (seconds)
+REQUEST_TIMEOUT = 30    # client-side total timeout; must exceed POLL_TIMEOUT
+WEBHOOK_PATH = "/telegram"
+# JSON-serialized update filter: the bot only handles plain messages, so
+# don't let Telegram send (or us parse) edited_message, inline_query etc.
+ALLOWED_UPDATES = '["message"]'
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+def chat_prefix(chat_id: str) -> str:
+    """Constant chat_id half of the sendMessage form body."""
+    return f"chat_id={quote_plus(str(chat_id))}&text="
+
+async def poll(session: aiohttp.ClientSession, base: str, offset: int):
+    async with session.get(f"{base}/getUpdates",
+                           params={"timeout": POLL_TIMEOUT, "offset": offset,
+                                   "allowed_updates": ALLOWED_UPDATES},
+                           timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as r:
+        if r.status != 200:
+            return None
+        return json_loads(await r.read())
+
+async def send(session: aiohttp.ClientSession, base: str, prefix: str, text: str):
+    body = (prefix + quote_plus(text)).encode("ascii")
+    try:
+        async with session.post(f"{base}/sendMessage", data=body,
+                                headers=FORM_HEADERS,
+                                timeout=aiohttp.ClientTimeout(total=10)) as r:
+            # Drain the body so the connection goes back to the pool
+            await r.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+
+def _reply_for(text: Optional[str], get_status_cb) -> Optional[str]:
+    text = (text or "").strip().lower()
+    if text in ("/start", "/help"):
+        return "Hi! Try /status to see current readings."
+    if text == "/status":
+        return get_status_cb()
+    if text in ("/motor_on", "/motor_off"):
+        return "Use keypad/logic; remote motor control is disabled in this bot."
+    return None
+
+async def _dispatch(session: aiohttp.ClientSession, base: str, chat_id: str,
+                    prefix: str, get_status_cb, upd: dict):
+    msg = upd.get("message") or {}
+    if str(msg.get("chat", {}).get("id", "")) != str(chat_id):
+        return  # ignore other chats
+    reply = _reply_for(msg.get("text"), get_status_cb)
+    if reply:
+        await send(session, base, prefix, reply)
+
+async def run_bot(token: str, chat_id: str, get_status_cb, stop_event: threading.Event):
+    base = f"https://api.telegram.org/bot{token}"
+    prefix = chat_prefix(chat_id)
+    connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=75)
+    offset = 0
+    async with aiohttp.ClientSession(connector=connector) as session:
+        while not stop_event.is_set():
+            try:
+                data = await poll(session, base, offset)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                await asyncio.sleep(3)
+                continue
+            if data is None:
+                await asyncio.sleep(2)
+                continue
+            for upd in data.get("result", []):
+                offset = max(offset, upd["update_id"] + 1)
+                await _dispatch(session, base, chat_id, prefix, get_status_cb, upd)
+
+async def run_webhook(token: str, chat_id: str, get_status_cb,
+                      public_url: str, port: int, stop_event: threading.Event):
+    base = f"https://api.telegram.org/bot{token}"
+    prefix = chat_prefix(chat_id)
+    connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=75)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def handle(request: web.Request) -> web.Response:
+            upd = json_loads(await request.read())
+            await _dispatch(session, base, chat_id, prefix, get_status_cb, upd)
+            return web.Response(text="ok")
+
+        try:
+            await session.post(f"{base}/setWebhook",
+                               data={"url": public_url.rstrip("/") + WEBHOOK_PATH,
+                                     "allowed_updates": ALLOWED_UPDATES},
+                               timeout=aiohttp.ClientTimeout(total=10))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass  # Telegram retries delivery; endpoint still comes up
+
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, port=port)
+        await site.start()
+        try:
+            while not stop_event.is_set():
+                await asyncio.sleep(1)
+        finally:
+            try:
+                await session.post(f"{base}/deleteWebhook",
+                                   timeout=aiohttp.ClientTimeout(total=10))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            await runner.cleanup()
+
+class TelegramBot:
+    """
+    Runs the bot on a dedicated asyncio loop thread; same start()/stop()
+    surface the old TelegramBotThread exposed to main.py. Uses the
+    webhook endpoint when webhook_url is given, long-polling otherwise.
+    """
+    def __init__(self, token: str, chat_id: str, get_status_cb,
+                 webhook_url: Optional[str] = None, webhook_port: int = 8080):
+        self.token = token
+        self.chat_id = chat_id
+        self.get_status_cb = get_status_cb
+        self.webhook_url = webhook_url
+        self.webhook_port = webhook_port
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        if self.webhook_url:
+            coro = run_webhook(self.token, self.chat_id, self.get_status_cb,
+                               self.webhook_url, self.webhook_port, self._stop)
+        else:
+            coro = run_bot(self.token, self.chat_id, self.get_status_cb, self._stop)
+        asyncio.run(coro)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()